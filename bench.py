@@ -0,0 +1,261 @@
+# Benchmarks for the katas.
+#
+#   python bench.py run -o before.json             sweep every case
+#   python bench.py run -k checkout --profile prof also dump cProfile output
+#   python bench.py compare before.json after.json exit 1 on a >10% p50 or memory regression
+#
+import argparse
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+
+# The katas are loose scripts rather than packages, so put their folders on
+# the path the same way running them from their own folder would.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+for folder in ('week1', 'week2', os.path.join('week4', 'checkoutkata')):
+    sys.path.insert(0, os.path.join(ROOT, folder))
+
+from bench_checkout import ListCheckout
+from Checkout import Checkout
+from DivisorRules import DivisorRules
+from fizzbuzzkata import fizzbuzz_line, fizzbuzz_range
+from function import perfect_number, perfect_number_fast, perfect_numbers_upto
+from Pricing import BasketThreshold, MultiBuy, PercentOff, PricingRules
+
+# Metrics compared by `compare`; both are lower-is-better. p90/p99 are
+# recorded too, but with a handful of repeats they are just the slowest run,
+# so a single noisy run would trip the gate.
+TRACKED = ('p50', 'peak_bytes')
+
+
+def _lines(n):
+    return [('sku%d' % (i % 500), 100 + i % 900) for i in range(n)]
+
+
+def _filled(cls, n, *args):
+    cart = cls(*args)
+    for item, price in _lines(n):
+        cart.add_item(item, price)
+    return cart
+
+
+RULES = PricingRules([MultiBuy('sku%d' % i, 3, 2) for i in range(0, 500, 2)]
+                     + [PercentOff(10, 'sku%d' % i) for i in range(1, 500, 2)]
+                     + [BasketThreshold(10000, percent=5)])
+
+
+# Each case maps a size to (fn, ops): fn does the work once and ops is how
+# many operations that is, so latency is reported per operation.
+
+def checkout_add_item(n):
+    lines = _lines(n)
+
+    def fn():
+        cart = Checkout()
+        for item, price in lines:
+            cart.add_item(item, price)
+    return fn, n
+
+
+def checkout_add_item_rules(n):
+    lines = _lines(n)
+
+    def fn():
+        cart = Checkout(RULES)
+        for item, price in lines:
+            cart.add_item(item, price)
+    return fn, n
+
+
+def checkout_add_items(n):
+    lines = _lines(n)
+    return lambda: Checkout(RULES).add_items(lines), n
+
+
+def _repeat(method, calls=100):
+    def fn():
+        for _ in range(calls):
+            method()
+    return fn, calls
+
+
+def checkout_cal_total(n):
+    return _repeat(_filled(Checkout, n).cal_total)
+
+
+def checkout_discount(n):
+    return _repeat(_filled(Checkout, n, RULES).discount)
+
+
+def list_checkout_cal_total(n):
+    return _repeat(_filled(ListCheckout, n).cal_total, 10)
+
+
+def perfect_reference(n):
+    return lambda: [perfect_number(i) for i in range(1, n)], n
+
+
+def perfect_fast(n):
+    return lambda: [perfect_number_fast(i) for i in range(1, n)], n
+
+
+def perfect_sieve(n):
+    return lambda: perfect_numbers_upto(n), n
+
+
+def fizzbuzz_lines(n):
+    return lambda: ''.join(map(fizzbuzz_line, range(10 ** 9, 10 ** 9 + n))), n
+
+
+def fizzbuzz_stream(n):
+    def fn():
+        for _ in fizzbuzz_range(10 ** 9, 10 ** 9 + n):
+            pass
+    return fn, n
+
+
+BAZZ = DivisorRules([(3, 'Fizz'), (5, 'Buzz'), (7, 'Bazz')])
+
+
+def fizzbuzz_stream_bazz(n):
+    def fn():
+        for _ in fizzbuzz_range(10 ** 9, 10 ** 9 + n, BAZZ):
+            pass
+    return fn, n
+
+
+CASES = {
+    'checkout.add_item': (checkout_add_item, (1000, 10000, 100000)),
+    'checkout.add_item_rules': (checkout_add_item_rules, (1000, 10000, 100000)),
+    'checkout.add_items': (checkout_add_items, (1000, 10000, 100000)),
+    'checkout.cal_total': (checkout_cal_total, (1000, 10000, 100000)),
+    'checkout.discount': (checkout_discount, (1000, 10000, 100000)),
+    'checkout.list_cal_total': (list_checkout_cal_total, (1000, 10000, 100000)),
+    'perfect.reference': (perfect_reference, (250, 500, 1000)),
+    'perfect.fast': (perfect_fast, (1000, 10000, 100000)),
+    'perfect.sieve': (perfect_sieve, (10000, 100000, 1000000)),
+    'fizzbuzz.line': (fizzbuzz_lines, (1000, 10000, 100000)),
+    'fizzbuzz.range': (fizzbuzz_stream, (100000, 1000000, 10000000)),
+    'fizzbuzz.range_bazz': (fizzbuzz_stream_bazz, (100000, 1000000, 10000000)),
+}
+
+
+def _percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def measure(fn, ops, repeat):
+    fn()  # warm-up: caches, templates, first-touch allocations
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) / ops)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    p50 = _percentile(times, 0.5)
+    return {
+        'ops': ops,
+        'p50': p50,
+        'p90': _percentile(times, 0.9),
+        'p99': _percentile(times, 0.99),
+        'throughput': 1 / p50 if p50 else None,
+        'peak_bytes': peak,
+    }
+
+
+def profile(name, fn, folder):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name.replace('/', '_'))
+    profiler = cProfile.Profile()
+    profiler.runcall(fn)
+    profiler.dump_stats(path + '.prof')
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(15)
+    with open(path + '.txt', 'w') as f:
+        f.write(report.getvalue())
+
+
+def run(args):
+    results = {}
+    for case, (setup, sizes) in CASES.items():
+        if args.cases and not any(pattern in case for pattern in args.cases):
+            continue
+        for size in sizes[:args.sizes]:
+            name = '%s/%d' % (case, size)
+            fn, ops = setup(size)
+            results[name] = measure(fn, ops, args.repeat)
+            if args.profile:
+                profile(name, fn, args.profile)
+            row = results[name]
+            print('%-32s p50 %10.3f us  p90 %10.3f us  %12.0f ops/s  peak %10d B'
+                  % (name, row['p50'] * 1e6, row['p90'] * 1e6, row['throughput'] or 0, row['peak_bytes']))
+    baseline = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    print('wrote %s' % args.output)
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        base = json.load(f)['results']
+    with open(args.current) as f:
+        current = json.load(f)['results']
+    regressions = 0
+    for name in sorted(set(base) & set(current)):
+        for metric in TRACKED:
+            old, new = base[name][metric], current[name][metric]
+            if not old:
+                continue
+            change = new / old - 1
+            flag = ''
+            if change > args.threshold:
+                flag = 'REGRESSED'
+                regressions += 1
+            print('%-32s %-10s %12.4g -> %12.4g  %+7.1f%%  %s' % (name, metric, old, new, change * 100, flag))
+    for name in sorted(set(base) - set(current)):
+        print('%-32s missing from %s' % (name, args.current))
+    print('%d regression(s) past %.0f%%' % (regressions, args.threshold * 100))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks for the katas.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    run_parser = commands.add_parser('run', help='sweep sizes and write a JSON baseline')
+    run_parser.add_argument('-o', '--output', default='bench.json')
+    run_parser.add_argument('-k', '--cases', nargs='*', help='only cases containing one of these')
+    run_parser.add_argument('-r', '--repeat', type=int, default=7)
+    run_parser.add_argument('--sizes', type=int, default=None, help='only the first N sizes of each case')
+    run_parser.add_argument('--profile', metavar='DIR', help='also dump a cProfile run of each case to DIR')
+
+    compare_parser = commands.add_parser('compare', help='fail when a tracked metric regressed')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('-t', '--threshold', type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import json
+
+from bench import main
+
+
+def write(path, p50, peak_bytes):
+    path.write_text(json.dumps({'results': {'checkout.add_item/1000': {'p50': p50, 'peak_bytes': peak_bytes}}}))
+    return str(path)
+
+
+def test_compare(tmp_path, capsys):
+    base = write(tmp_path / 'base.json', 1.0, 1000)
+    assert main(['compare', base, write(tmp_path / 'slow.json', 1.5, 1000)]) == 1
+    assert 'REGRESSED' in capsys.readouterr().out
+    assert main(['compare', base, write(tmp_path / 'ok.json', 1.05, 1000)]) == 0
+    assert main(['compare', base, write(tmp_path / 'fat.json', 1.0, 2000)]) == 1
+    assert main(['compare', base, write(tmp_path / 'fat.json', 1.0, 2000), '-t', '1.5']) == 0
@@ -1,7 +1,116 @@
+import math
+import multiprocessing
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
 def perfect_number(n):
     sum = 0
     for x in range(1, n):
         if n % x == 0:
             sum += x
     return sum == n
-print(perfect_number(28))
\ No newline at end of file
+
+
+def divisor_sum(n):
+    # sum of the proper divisors of n, pairing d with n // d up to sqrt(n)
+    if n < 2:
+        return 0
+    sum = 1
+    for d in range(2, math.isqrt(n) + 1):
+        if n % d == 0:
+            q = n // d
+            sum += d if q == d else d + q
+    return sum
+
+
+def perfect_number_fast(n):
+    return n > 1 and divisor_sum(n) == n
+
+
+def divisor_sums(lo, hi):
+    # proper divisor sums of lo..hi-1 (lo >= 1) as a sieve over the segment:
+    # each d <= sqrt(hi) is credited with its cofactor k >= d at d * k
+    # without touching anything outside [lo, hi)
+    size = hi - lo
+    sums = np.zeros(size, dtype=np.int64) if np is not None else [0] * size
+    for d in range(1, math.isqrt(hi - 1) + 1):
+        start = max(d * d, -(-lo // d) * d)
+        if start >= hi:
+            continue
+        first, last = start // d, (hi - 1) // d
+        if np is not None:
+            sums[start - lo::d] += d
+            sums[start - lo::d] += np.arange(first, last + 1, dtype=np.int64)
+        else:
+            for k in range(first, last + 1):
+                sums[d * k - lo] += d + k
+        if start == d * d:
+            sums[start - lo] -= d
+    # the pass above counts n itself (d = 1, k = n)
+    if np is not None:
+        sums -= np.arange(lo, hi, dtype=np.int64)
+    else:
+        sums = [sums[i] - (lo + i) for i in range(size)]
+    return sums
+
+
+def classify(n):
+    # only positive integers are perfect, abundant or deficient
+    if n < 1:
+        raise ValueError('Invalid Number')
+    sum = divisor_sum(n)
+    if sum == n:
+        return 'perfect'
+    return 'abundant' if sum > n else 'deficient'
+
+
+def _segment(bounds):
+    lo, hi = bounds
+    sums = divisor_sums(lo, hi)
+    if np is not None:
+        numbers = np.arange(lo, hi, dtype=np.int64)
+        perfect = (lo + np.flatnonzero(sums == numbers)).tolist()
+        abundant = int(np.count_nonzero(sums > numbers))
+    else:
+        perfect = [lo + i for i, s in enumerate(sums) if s == lo + i]
+        abundant = sum(1 for i, s in enumerate(sums) if s > lo + i)
+    return perfect, abundant, hi - lo
+
+
+def _segments(n, segment):
+    for lo in range(1, n + 1, segment):
+        yield lo, min(lo + segment, n + 1)
+
+
+def _scan(n, segment, processes):
+    # each segment holds at most `segment` sums, so memory stays bounded
+    # however large n is; segments can be spread over a process pool
+    if processes is None or processes == 1:
+        yield from map(_segment, _segments(n, segment))
+        return
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap(_segment, _segments(n, segment))
+
+
+def perfect_numbers_upto(n, segment=1 << 20, processes=None):
+    perfect = []
+    for found, _, _ in _scan(n, segment, processes):
+        perfect.extend(found)
+    return perfect
+
+
+def classify_upto(n, segment=1 << 20, processes=None):
+    counts = {'perfect': 0, 'abundant': 0, 'deficient': 0}
+    for found, abundant, size in _scan(n, segment, processes):
+        counts['perfect'] += len(found)
+        counts['abundant'] += abundant
+        counts['deficient'] += size - len(found) - abundant
+    return counts
+
+
+if __name__ == '__main__':
+    print(perfect_number(28))
@@ -0,0 +1,35 @@
+import pytest
+
+import function
+from function import (classify, classify_upto, divisor_sums, perfect_number,
+                      perfect_number_fast, perfect_numbers_upto)
+
+
+def test_perfect_number_fast():
+    for n in range(1, 2000):
+        assert perfect_number_fast(n) == perfect_number(n)
+    assert perfect_number_fast(33550336)
+def test_divisor_sums():
+    sums = divisor_sums(1, 600)
+    for n in range(1, 600):
+        assert sums[n - 1] == sum(x for x in range(1, n) if n % x == 0)
+    assert list(divisor_sums(250, 600)) == list(sums[249:])
+def test_divisor_sums_without_numpy(monkeypatch):
+    expected = [int(s) for s in divisor_sums(90, 400)]
+    monkeypatch.setattr(function, 'np', None)
+    assert divisor_sums(90, 400) == expected
+def test_perfect_numbers_upto():
+    expected = [n for n in range(1, 3000) if perfect_number(n)]
+    assert perfect_numbers_upto(2999) == expected
+    assert perfect_numbers_upto(2999, segment=97) == expected
+    assert perfect_numbers_upto(10000, segment=1000, processes=2) == [6, 28, 496, 8128]
+def test_classify_upto():
+    counts = {'perfect': 0, 'abundant': 0, 'deficient': 0}
+    for n in range(1, 1000):
+        counts[classify(n)] += 1
+    assert classify_upto(999, segment=64) == counts
+def test_classify():
+    assert [classify(n) for n in (1, 6, 12, 28)] == ['deficient', 'perfect', 'abundant', 'perfect']
+    for n in (0, -5):
+        with pytest.raises(ValueError):
+            classify(n)
@@ -0,0 +1,59 @@
+import itertools
+import math
+
+
+class DivisorRules:
+    # (divisor, word) rules, e.g. [(3, 'Fizz'), (5, 'Buzz'), (7, 'Bazz')].
+    # The output only depends on n % lcm(divisors), so one period is
+    # tabulated up front and every n is a table lookup however many rules
+    # there are. Periods over max_table fall back to checking each rule.
+    def __init__(self, rules, max_table=1 << 20):
+        self.rules = tuple((divisor, word) for divisor, word in rules)
+        for divisor, word in self.rules:
+            if type(divisor) != int or divisor < 1:
+                raise ValueError('Invalid Divisor')
+        self.max_table = max_table
+        self.period = 1
+        for divisor, _ in self.rules:
+            self.period = self.period * divisor // math.gcd(self.period, divisor)
+        self._table = None
+        if self.period <= max_table:
+            self._table = [self._words(r) or None for r in range(self.period)]
+
+    # equal rule lists give the same output, so caches can share their work
+    def __eq__(self, other):
+        return isinstance(other, DivisorRules) and self.rules == other.rules
+
+    def __hash__(self):
+        return hash(self.rules)
+
+    def __reduce__(self):
+        # ship the rules, not the table, to worker processes
+        return DivisorRules, (self.rules, self.max_table)
+
+    def _words(self, n):
+        return ''.join(word for divisor, word in self.rules if n % divisor == 0)
+
+    def is_number(self, n):
+        if self._table is not None:
+            return self._table[n % self.period] is None
+        return not self._words(n)
+
+    def word(self, n):
+        if self._table is not None:
+            return self._table[n % self.period] or str(n)
+        return self._words(n) or str(n)
+
+    def line(self, n):
+        return self.word(n) + '\n'
+
+    def lines(self, start, stop):
+        # output for start..stop-1 as one string
+        if self._table is None:
+            return ''.join(map(self.line, range(start, stop)))
+        table = itertools.islice(itertools.cycle(self._table), start % self.period, None)
+        return ''.join(words + '\n' if words else '%d\n' % n
+                       for n, words in zip(range(start, stop), table))
+
+
+FIZZBUZZ = DivisorRules([(3, 'Fizz'), (5, 'Buzz')])
@@ -1,14 +1,210 @@
+import argparse
+import collections
+import functools
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from DivisorRules import DivisorRules, FIZZBUZZ
+
+
 def FizzBuzz():
 
     num = input('What is your number')
 
-    if ((int(num) % 3 ==0) & (int(num) % 5 == 0)) :
-        print('FizzBuzz')
-    elif int(num) % 3 == 0 :
-        print('Fizz')
-    elif int(num) % 5 == 0:
-        print('Buzz')
-    else :
-        print(num)
+    print(FIZZBUZZ.word(int(num)))
+
+
+# Range mode. Output is produced in blocks of BLOCK numbers starting at a
+# multiple of BLOCK. Inside a block every number has the same high digits
+# (n // BLOCK), and the layout of words in a block only depends on its phase,
+# the block start modulo the rules' period (for 3/5 one of three phases, as
+# BLOCK % 15 == 10). So each (rules, width, phase) gets one prebuilt block of
+# bytes and producing the next block only rewrites the high digits that
+# changed, usually just the last one. The prebuilt blocks are shared and never
+# written to; each fizzbuzz_range call edits its own copies, so concurrent
+# calls are safe. Range edges, numbers below BLOCK and rules with more than
+# MAX_PHASES phases go line by line.
+BLOCK_DIGITS = 4
+BLOCK = 10 ** BLOCK_DIGITS
+MAX_PHASES = 64
+# prebuilt blocks kept per (rules, width, phase), least recently used first
+# out; enough for one width of the most phases allowed. Rules compare by value.
+MAX_TEMPLATES = MAX_PHASES
+
+
+def fizzbuzz_line(n, rules=FIZZBUZZ):
+    return rules.line(n)
+
+
+def _lines(start, stop, rules):
+    return rules.lines(start, stop).encode()
+
+
+@functools.lru_cache(maxsize=MAX_TEMPLATES)
+def _block_pieces(rules, phase):
+    # the block as bytes split where each number's high digits go
+    lines = []
+    for j in range(BLOCK):
+        if rules.is_number(phase + j):
+            lines.append('\0%0*d\n' % (BLOCK_DIGITS, j))
+        else:
+            lines.append(rules.line(phase + j))
+    return ''.join(lines).encode().split(b'\0')
+
+
+@functools.lru_cache(maxsize=MAX_TEMPLATES)
+def _block_template(rules, width, phase):
+    pieces = _block_pieces(rules, phase)
+    if np is None:
+        return pieces
+    high = width - BLOCK_DIGITS
+    # int64 even when the block has no plain numbers (cumsum of [] is float)
+    starts = (np.cumsum([len(piece) for piece in pieces[:-1]], dtype=np.int64)
+              + high * np.arange(len(pieces) - 1, dtype=np.int64))
+    columns = starts + np.arange(high)[:, None]
+    buf = np.frombuffer((b'0' * high).join(pieces), dtype=np.uint8)
+    return buf, columns
+
+
+def _block(rules, high, width, copies):
+    # copies holds this caller's editable [buf, columns, digits] per block
+    key = rules, width, high * BLOCK % rules.period
+    template = _block_template(*key)
+    digits = b'%d' % high
+    if np is None:
+        return digits.join(template)
+    state = copies.get(key)
+    if state is None:
+        buf, columns = template
+        state = copies[key] = [buf.copy(), columns, b'0' * len(digits)]
+    buf, columns, current = state
+    for c in range(len(digits)):
+        if digits[c] != current[c]:
+            buf[columns[c]] = digits[c]
+    state[2] = digits
+    return buf.tobytes()
+
+
+def fizzbuzz_range(start, stop, rules=FIZZBUZZ):
+    # yields the output for start..stop-1 as bytes chunks
+    if rules.period // math.gcd(rules.period, BLOCK) > MAX_PHASES:
+        for lo in range(start, stop, BLOCK):
+            yield _lines(lo, min(lo + BLOCK, stop), rules)
+        return
+    copies = {}
+    n = start
+    if n < BLOCK:
+        end = min(stop, BLOCK)
+        if n < end:
+            yield _lines(n, end, rules)
+        n = BLOCK
+    while n < stop:
+        # blocks never cross a change in digit count since n >= BLOCK
+        end = min(stop, 10 ** len(str(n)))
+        first = -(-n // BLOCK) * BLOCK
+        last = end // BLOCK * BLOCK
+        if first >= last:
+            yield _lines(n, end, rules)
+            n = end
+            continue
+        if n < first:
+            yield _lines(n, first, rules)
+        width = len(str(first))
+        for high in range(first // BLOCK, last // BLOCK):
+            yield _block(rules, high, width, copies)
+        if last < end:
+            yield _lines(last, end, rules)
+        n = end
+
+
+_rules = FIZZBUZZ
+
+
+def _init_worker(rules):
+    global _rules
+    _rules = rules
+
+
+def _render(bounds):
+    return b''.join(fizzbuzz_range(bounds[0], bounds[1], _rules))
+
+
+def _pieces(start, stop, size):
+    # piece edges fall on multiples of size so only the ends are partial
+    lo = start
+    while lo < stop:
+        hi = min(stop, (lo // size + 1) * size)
+        yield lo, hi
+        lo = hi
+
+
+def write_range(start, stop, fd, processes=None, piece=BLOCK * 64, rules=FIZZBUZZ):
+    # Writes start..stop-1 to fd and returns the number of bytes written.
+    # With processes > 1 pieces are rendered in a pool and written in order,
+    # with at most two pieces per worker in flight.
+    written = 0
+    if processes is None or processes == 1:
+        chunks = fizzbuzz_range(start, stop, rules)
+    else:
+        chunks = _pooled(_pieces(start, stop, piece), processes, rules)
+    for chunk in chunks:
+        view = memoryview(chunk)
+        while view:
+            sent = os.write(fd, view)
+            view = view[sent:]
+        written += len(chunk)
+    return written
+
+
+def _pooled(pieces, processes, rules):
+    with multiprocessing.Pool(processes, _init_worker, (rules,)) as pool:
+        pending = collections.deque()
+        for bounds in pieces:
+            pending.append(pool.apply_async(_render, (bounds,)))
+            if len(pending) >= processes * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def _rule(text):
+    divisor, _, word = text.partition(':')
+    return int(divisor), word
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='FizzBuzz for start..stop (inclusive).')
+    parser.add_argument('start', type=int)
+    parser.add_argument('stop', type=int)
+    parser.add_argument('-o', '--output', default=None)
+    parser.add_argument('-j', '--processes', type=int, default=None)
+    parser.add_argument('-r', '--rule', type=_rule, action='append', metavar='DIVISOR:WORD',
+                        help='replaces the 3:Fizz 5:Buzz rules, e.g. -r 3:Fizz -r 5:Buzz -r 7:Bazz')
+    args = parser.parse_args(argv)
+    rules = DivisorRules(args.rule) if args.rule else FIZZBUZZ
+
+    start = time.perf_counter()
+    if args.output is None:
+        sys.stdout.flush()
+        written = write_range(args.start, args.stop + 1, sys.stdout.fileno(), args.processes, rules=rules)
+    else:
+        with open(args.output, 'wb') as f:
+            written = write_range(args.start, args.stop + 1, f.fileno(), args.processes, rules=rules)
+    elapsed = time.perf_counter() - start
+    print('%d bytes in %.2fs (%.3f GB/s)' % (written, elapsed, written / (elapsed or float('inf')) / 1e9),
+          file=sys.stderr)
+
 
-FizzBuzz()
\ No newline at end of file
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main()
+    else:
+        FizzBuzz()
@@ -0,0 +1,53 @@
+import math
+
+import pytest
+
+from DivisorRules import DivisorRules, FIZZBUZZ
+from fizzbuzzkata import BLOCK, MAX_PHASES, fizzbuzz_range, main, write_range
+from fizzbuzzrangetest import EDGES, reference
+
+
+RULES = [((3, 'Fizz'), (5, 'Buzz')), ((3, 'Fizz'), (5, 'Buzz'), (7, 'Bazz')),
+         ((16, 'x'), (625, 'y')), ((3, '7up'),), ((1, 'one'),), ()]
+
+
+def test_range_rules():
+    for rules in RULES:
+        for start, stop in EDGES[2:6]:
+            assert b''.join(fizzbuzz_range(start, stop, DivisorRules(rules))) == reference(start, stop, rules)
+def test_range_rules_past_max_phases():
+    rules = ((3, 'Fizz'), (5, 'Buzz'), (7, 'Bazz'), (11, 'Fuzz'))
+    period = DivisorRules(rules).period
+    assert period // math.gcd(period, BLOCK) > MAX_PHASES
+    start, stop = 10 ** 6 - 3 * BLOCK - 1, 10 ** 6 + BLOCK + 1
+    assert b''.join(fizzbuzz_range(start, stop, DivisorRules(rules))) == reference(start, stop, rules)
+def test_write_range_rules(tmp_path):
+    path = tmp_path / 'out'
+    rules = ((3, 'Fizz'), (5, 'Buzz'), (7, 'Bazz'))
+    start, stop = 3, 10 * BLOCK + 3
+    with open(str(path), 'wb') as f:
+        write_range(start, stop, f.fileno(), processes=2, piece=3 * BLOCK, rules=DivisorRules(rules))
+    assert path.read_bytes() == reference(start, stop, rules)
+def test_main_rules(tmp_path, capsys):
+    path = tmp_path / 'out'
+    main(['1', '21', '-o', str(path), '-r', '3:Fizz', '-r', '5:Buzz', '-r', '7:Bazz'])
+    assert path.read_bytes() == reference(1, 22, ((3, 'Fizz'), (5, 'Buzz'), (7, 'Bazz')))
+    assert 'GB/s' in capsys.readouterr().err
+    main([str(BLOCK), str(2 * BLOCK), '-o', str(path), '-r', '1:X'])
+    assert path.read_bytes() == b'X\n' * (BLOCK + 1)
+def test_divisor_rules():
+    assert FIZZBUZZ.period == 15
+    assert [FIZZBUZZ.word(n) for n in (9, 10, 30, 0, -3, 7)] == ['Fizz', 'Buzz', 'FizzBuzz', 'FizzBuzz', 'Fizz', '7']
+    assert FIZZBUZZ.lines(98, 106).encode() == reference(98, 106)
+    assert DivisorRules([(3, 'Fizz'), (5, 'Buzz')]) == FIZZBUZZ
+    assert hash(DivisorRules([(3, 'Fizz'), (5, 'Buzz')])) == hash(FIZZBUZZ)
+    with pytest.raises(ValueError):
+        DivisorRules([(0, 'Zero')])
+def test_divisor_rules_small_table():
+    rules = ((3, 'Fizz'), (5, 'Buzz'), (7, 'Bazz'))
+    small = DivisorRules(rules, max_table=10)
+    assert small.period == 105
+    assert small._table is None
+    assert small.lines(1, 300).encode() == reference(1, 300, rules)
+    assert [small.is_number(n) for n in (1, 21, 22)] == [True, False, True]
+    assert b''.join(fizzbuzz_range(BLOCK - 50, BLOCK + 50, small)) == reference(BLOCK - 50, BLOCK + 50, rules)
@@ -0,0 +1,61 @@
+import threading
+
+import fizzbuzzkata
+from fizzbuzzkata import BLOCK, fizzbuzz_range, main, write_range
+
+
+def reference(start, stop, rules=((3, 'Fizz'), (5, 'Buzz'))):
+    lines = []
+    for n in range(start, stop):
+        words = ''.join(word for divisor, word in rules if n % divisor == 0)
+        lines.append((words or str(n)) + '\n')
+    return ''.join(lines).encode()
+
+
+EDGES = [(-20, 31), (1, 101), (BLOCK - 17, BLOCK + 23), (BLOCK - 1, 3 * BLOCK + 1),
+         (5 * BLOCK + 3, 8 * BLOCK - 3), (10 ** 5 - 2 * BLOCK - 7, 10 ** 5 + BLOCK + 9),
+         (10 ** 12 - BLOCK - 1, 10 ** 12 + 2 * BLOCK + 1), (10 ** 18 - BLOCK, 10 ** 18 + BLOCK)]
+
+
+def test_fizzbuzz_line():
+    assert [fizzbuzzkata.fizzbuzz_line(n) for n in (3, 5, 15, 7)] == ['Fizz\n', 'Buzz\n', 'FizzBuzz\n', '7\n']
+def test_range_edges():
+    for start, stop in EDGES:
+        assert b''.join(fizzbuzz_range(start, stop)) == reference(start, stop)
+def test_range_edges_without_numpy(monkeypatch):
+    monkeypatch.setattr(fizzbuzzkata, 'np', None)
+    fizzbuzzkata._block_template.cache_clear()
+    try:
+        for start, stop in EDGES:
+            assert b''.join(fizzbuzz_range(start, stop)) == reference(start, stop)
+    finally:
+        fizzbuzzkata._block_template.cache_clear()
+def test_range_threads():
+    ranges = [(10 ** 6 * k + 7, 10 ** 6 * k + 20 * BLOCK + 7) for k in range(1, 5)]
+    results = {}
+    def render(bounds):
+        results[bounds] = [b''.join(fizzbuzz_range(*bounds)) for _ in range(3)]
+    threads = [threading.Thread(target=render, args=(bounds,)) for bounds in ranges]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for bounds in ranges:
+        assert results[bounds] == [reference(*bounds)] * 3
+def test_write_range(tmp_path):
+    path = tmp_path / 'out'
+    start, stop = BLOCK - 5, 6 * BLOCK + 5
+    with open(str(path), 'wb') as f:
+        assert write_range(start, stop, f.fileno()) == len(reference(start, stop))
+    assert path.read_bytes() == reference(start, stop)
+def test_write_range_processes(tmp_path):
+    path = tmp_path / 'out'
+    start, stop = 3, 10 * BLOCK + 3
+    with open(str(path), 'wb') as f:
+        write_range(start, stop, f.fileno(), processes=2, piece=3 * BLOCK)
+    assert path.read_bytes() == reference(start, stop)
+def test_main(tmp_path, capsys):
+    path = tmp_path / 'out'
+    main(['1', '21', '-o', str(path)])
+    assert path.read_bytes() == reference(1, 22)
+    assert 'GB/s' in capsys.readouterr().err
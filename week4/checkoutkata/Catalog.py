@@ -0,0 +1,114 @@
+import functools
+import mmap
+import struct
+import sys
+
+# On-disk index: a header followed by fixed-width records sorted by SKU, each
+# the SKU (utf-8, NUL padded to the widest SKU) and its price as int64.
+# Lookups binary-search the memory-mapped file, so opening a catalog does not
+# read it and only the pages a search touches are loaded.
+MAGIC = b'CKCT'
+HEADER = struct.Struct('<4sQI')
+PRICE = struct.Struct('<q')
+
+
+class Catalog:
+    def __init__(self, path, cache_size=4096):
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file cannot be mapped
+            self._file.close()
+            raise ValueError('Invalid Catalog') from None
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError('Invalid Catalog')
+        magic, self._count, self._width = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or len(self._mm) < HEADER.size + self._count * (self._width + PRICE.size):
+            self.close()
+            raise ValueError('Invalid Catalog')
+        self._record = self._width + PRICE.size
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._lookup)
+
+    @staticmethod
+    def build(rows, path):
+        # rows is an iterable of (sku, price); a later row for a SKU wins
+        prices = {}
+        for sku, price in rows:
+            # checked before the file is opened, so a bad row leaves no partial index
+            if type(price) != int or not -2 ** 63 <= price < 2 ** 63:
+                raise ValueError('Invalid Price')
+            prices[sku.encode()] = price
+        width = max(map(len, prices), default=0)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(prices), width))
+            for key in sorted(prices):
+                f.write(key.ljust(width, b'\0'))
+                f.write(PRICE.pack(prices[key]))
+
+    def _lookup(self, sku):
+        key = sku.encode()
+        if len(key) > self._width:
+            raise KeyError(sku)
+        key = key.ljust(self._width, b'\0')
+        mm, record, width = self._mm, self._record, self._width
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = HEADER.size + mid * record
+            probe = mm[pos:pos + width]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return PRICE.unpack_from(mm, pos + width)[0]
+        raise KeyError(sku)
+
+    def price(self, sku):
+        return self._cached(sku)
+
+    def __contains__(self, sku):
+        try:
+            self.price(sku)
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def hits(self):
+        return self._cached.cache_info().hits
+
+    @property
+    def misses(self):
+        return self._cached.cache_info().misses
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv):
+    # python Catalog.py catalog.csv catalog.idx  (rows of sku,price)
+    def rows(f):
+        for line in f:
+            sku, _, price = line.rstrip('\r\n').rpartition(',')
+            if price.strip().lstrip('-').isdigit():
+                yield sku, int(price)
+
+    with open(argv[1]) as f:
+        Catalog.build(rows(f), argv[2])
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -1,27 +1,142 @@
+from array import array
+
+from Pricing import PricingRules
+
+
 class Checkout:
-    def __init__(self):
-        self.item = []
-        self.price = []
+    # prices live in a packed int64 column and item names are interned into
+    # an id table, so a line costs 16 bytes instead of two boxed objects
+    __slots__ = ('_names', '_ids', '_item_ids', '_prices', '_total', '_count',
+                 '_rules', '_sku_count', '_sku_total', '_sku_saving', '_saving',
+                 '_catalog')
+
+    def __init__(self, rules=None, catalog=None):
+        self._names = []
+        self._ids = {}
+        self._item_ids = array('q')
+        self._prices = array('q')
+        self._total = 0
+        self._count = 0
+        if rules is not None and not isinstance(rules, PricingRules):
+            rules = PricingRules(rules)
+        self._rules = rules
+        # per-SKU state is only kept for SKUs that have a promotion
+        self._sku_count = {}
+        self._sku_total = {}
+        self._sku_saving = {}
+        self._saving = 0
+        self._catalog = catalog
+
+    def _intern(self, item):
+        item_id = self._ids.get(item)
+        if item_id is None:
+            item_id = len(self._names)
+            self._ids[item] = item_id
+            self._names.append(item)
+        return item_id
+
+    def _reprice(self, item, count, amount):
+        # re-evaluate only the rules indexed under this SKU
+        count += self._sku_count.get(item, 0)
+        amount += self._sku_total.get(item, 0)
+        saving = self._rules.sku_saving(item, count, amount)
+        self._saving += saving - self._sku_saving.get(item, 0)
+        self._sku_count[item] = count
+        self._sku_total[item] = amount
+        self._sku_saving[item] = saving
 
     def add_item(self, item, price):
         if type(price) != int:
             raise ValueError('Invalid Price')
-        self.item.append(item)
-        self.price.append(price)
+        item_id = self._intern(item)
+        try:
+            self._prices.append(price)
+        except OverflowError:
+            raise ValueError('Invalid Price') from None
+        self._item_ids.append(item_id)
+        self._total += price
+        self._count += 1
+        if self._rules is not None and item in self._rules.by_sku:
+            self._reprice(item, 1, price)
+
+    def add_sku(self, sku):
+        # price comes from the catalog; unknown SKUs raise KeyError
+        if self._catalog is None:
+            raise ValueError('No Catalog')
+        self.add_item(sku, self._catalog.price(sku))
+
+    def add_items(self, items, prices=None):
+        # either an iterable of (item, price) pairs or two parallel columns,
+        # which may be NumPy arrays; the batch is all-or-nothing
+        if prices is None:
+            pairs = list(items)
+            items = [pair[0] for pair in pairs]
+            prices = [pair[1] for pair in pairs]
+        else:
+            items = items.tolist() if hasattr(items, 'tolist') else list(items)
+        if len(items) != len(prices):
+            raise ValueError('Items and prices differ in length')
+
+        if getattr(prices, 'dtype', None) is not None and prices.dtype.kind in 'iu':
+            if prices.dtype.kind == 'u' and len(prices):
+                too_big = prices > 2 ** 63 - 1
+                if too_big.any():
+                    raise ValueError('Invalid Price at index %d' % too_big.argmax())
+            column = array('q')
+            column.frombytes(prices.astype('=i8').tobytes())
+        else:
+            if hasattr(prices, 'tolist'):
+                prices = prices.tolist()
+            if set(map(type, prices)) - {int}:
+                for i, price in enumerate(prices):
+                    if type(price) != int:
+                        raise ValueError('Invalid Price at index %d' % i)
+            try:
+                column = array('q', prices)
+            except OverflowError:
+                for i, price in enumerate(prices):
+                    if not -2 ** 63 <= price < 2 ** 63:
+                        raise ValueError('Invalid Price at index %d' % i) from None
+                raise
+
+        ids = array('q', map(self._intern, items))
+        self._prices.extend(column)
+        self._item_ids.extend(ids)
+        self._total += sum(column)
+        self._count += len(column)
+        if self._rules is not None:
+            by_sku = self._rules.by_sku
+            touched = {}
+            for item, price in zip(items, column):
+                if item in by_sku:
+                    count, amount = touched.get(item, (0, 0))
+                    touched[item] = count + 1, amount + price
+            for item, (count, amount) in touched.items():
+                self._reprice(item, count, amount)
+        return self.cal_total(), self.discount()
+
+    @property
+    def item(self):
+        names = self._names
+        return [names[i] for i in self._item_ids]
+
+    @property
+    def price(self):
+        # a copy, so callers cannot change the cart behind the running total
+        return self._prices.tolist()
+
+    def __len__(self):
+        return self._count
+
     def cal_total(self):
-        total = 0
-        for i in self.price:
-            total += i
-        return total
+        return self._total
+
     def discount(self):
-        total = 0
-        for i in self.price:
-            total += i
-        return total
-        dis = total - (total * .10)
-        return dis
+        if self._rules is None:
+            return self._total
+        total = self._total - self._saving
+        return total - self._rules.basket_saving(self._count, total)
 
     # def exception(self):
     #     if self.price == None:
     #         raise Exception("Invalid price")
-
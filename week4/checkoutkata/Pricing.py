@@ -0,0 +1,79 @@
+class PercentOff:
+    # percent off one SKU, or off the whole basket when sku is None
+    __slots__ = ('percent', 'sku')
+
+    def __init__(self, percent, sku=None):
+        if type(percent) != int or not 0 <= percent <= 100:
+            raise ValueError('Invalid Percent')
+        self.percent = percent
+        self.sku = sku
+
+    def saving(self, count, subtotal):
+        return subtotal * self.percent // 100
+
+
+class MultiBuy:
+    # "buy for pay", e.g. MultiBuy('tea', 3, 2) is 3 for the price of 2
+    __slots__ = ('sku', 'buy', 'pay')
+
+    def __init__(self, sku, buy, pay):
+        if type(buy) != int or type(pay) != int or not 0 <= pay < buy:
+            raise ValueError('Invalid Multi-buy')
+        self.sku = sku
+        self.buy = buy
+        self.pay = pay
+
+    def saving(self, count, subtotal):
+        if count < self.buy:
+            return 0
+        free = count // self.buy * (self.buy - self.pay)
+        return subtotal * free // count
+
+
+class BasketThreshold:
+    # amount and/or percent off once the basket reaches threshold
+    __slots__ = ('threshold', 'amount', 'percent')
+    sku = None
+
+    def __init__(self, threshold, amount=0, percent=0):
+        if type(threshold) != int or threshold < 0:
+            raise ValueError('Invalid Threshold')
+        if type(amount) != int or amount < 0:
+            raise ValueError('Invalid Amount')
+        if type(percent) != int or not 0 <= percent <= 100:
+            raise ValueError('Invalid Percent')
+        self.threshold = threshold
+        self.amount = amount
+        self.percent = percent
+
+    def saving(self, count, subtotal):
+        if subtotal < self.threshold:
+            return 0
+        return min(subtotal, self.amount + subtotal * self.percent // 100)
+
+
+class PricingRules:
+    # rules compiled into a SKU-keyed index; basket-wide rules are kept apart
+    # because they depend on the whole cart rather than on one line
+    def __init__(self, rules=()):
+        self.by_sku = {}
+        self.basket = []
+        for rule in rules:
+            if rule.sku is None:
+                self.basket.append(rule)
+            else:
+                self.by_sku.setdefault(rule.sku, []).append(rule)
+
+    def __len__(self):
+        return len(self.basket) + sum(map(len, self.by_sku.values()))
+
+    def sku_saving(self, sku, count, subtotal):
+        # the best single deal for a SKU wins, never more than its subtotal
+        # and never below zero (prices may be negative, e.g. refunds)
+        best = max(rule.saving(count, subtotal) for rule in self.by_sku[sku])
+        return max(0, min(best, subtotal))
+
+    def basket_saving(self, count, subtotal):
+        if not self.basket:
+            return 0
+        return max(0, max(rule.saving(count, subtotal) for rule in self.basket))
@@ -0,0 +1,146 @@
+import asyncio
+import functools
+import threading
+import time
+
+from Checkout import Checkout
+from Pricing import PricingRules
+
+
+def _totals(checkout):
+    return checkout.cal_total(), checkout.discount()
+
+
+class _Shard:
+    __slots__ = ('lock', 'carts')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # session id -> [Checkout, last used]
+        self.carts = {}
+
+
+class SessionManager:
+    # Carts are spread over independently locked shards by session id, so
+    # lanes only contend when their sessions hash to the same shard.
+    # Idle carts are not dropped on their own: the owner calls evict_idle()
+    # periodically (AsyncSessionManager.sweep() does that on a loop).
+    def __init__(self, rules=None, catalog=None, shards=64, idle_timeout=None):
+        if rules is not None and not isinstance(rules, PricingRules):
+            rules = PricingRules(rules)
+        self._rules = rules
+        self._catalog = catalog
+        self._idle_timeout = idle_timeout
+        if type(shards) != int or shards < 1:
+            raise ValueError('Invalid Shards')
+        self._shards = [_Shard() for _ in range(shards)]
+
+    def _shard(self, sid):
+        return self._shards[hash(sid) % len(self._shards)]
+
+    def _locked(self, shard, sid, create, fn, args):
+        # caller holds shard.lock
+        entry = shard.carts.get(sid)
+        if entry is None:
+            if not create:
+                raise KeyError(sid)
+            entry = shard.carts[sid] = [Checkout(self._rules, self._catalog), 0.0]
+        entry[1] = time.monotonic()
+        return fn(entry[0], *args)
+
+    def _call(self, sid, create, fn, *args):
+        shard = self._shard(sid)
+        with shard.lock:
+            return self._locked(shard, sid, create, fn, args)
+
+    def add_item(self, sid, item, price):
+        self._call(sid, True, Checkout.add_item, item, price)
+
+    def add_items(self, sid, items, prices=None):
+        return self._call(sid, True, Checkout.add_items, items, prices)
+
+    def add_sku(self, sid, sku):
+        self._call(sid, True, Checkout.add_sku, sku)
+
+    def totals(self, sid):
+        return self._call(sid, False, _totals)
+
+    def close(self, sid):
+        # removes the cart and returns its final (total, discount)
+        shard = self._shard(sid)
+        with shard.lock:
+            checkout = shard.carts.pop(sid)[0]
+        return _totals(checkout)
+
+    def evict_idle(self, now=None):
+        if self._idle_timeout is None:
+            return 0
+        cutoff = (time.monotonic() if now is None else now) - self._idle_timeout
+        evicted = 0
+        for shard in self._shards:
+            with shard.lock:
+                stale = [sid for sid, entry in shard.carts.items() if entry[1] < cutoff]
+                for sid in stale:
+                    del shard.carts[sid]
+            evicted += len(stale)
+        return evicted
+
+    def __contains__(self, sid):
+        return sid in self._shard(sid).carts
+
+    def __len__(self):
+        return sum(len(shard.carts) for shard in self._shards)
+
+
+class AsyncSessionManager:
+    # asyncio front for a SessionManager. Cart operations are short, so an
+    # uncontended shard is used straight from the event loop; a contended one
+    # is waited on in the default executor instead of blocking the loop.
+    # add_sku always runs in the executor, as its catalog lookup may block.
+    def __init__(self, manager=None, **kwargs):
+        self.manager = manager if manager is not None else SessionManager(**kwargs)
+
+    async def _call(self, sid, create, fn, *args):
+        manager = self.manager
+        shard = manager._shard(sid)
+        if shard.lock.acquire(blocking=False):
+            try:
+                return manager._locked(shard, sid, create, fn, args)
+            finally:
+                shard.lock.release()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(manager._call, sid, create, fn, *args))
+
+    async def add_item(self, sid, item, price):
+        await self._call(sid, True, Checkout.add_item, item, price)
+
+    async def add_items(self, sid, items, prices=None):
+        return await self._call(sid, True, Checkout.add_items, items, prices)
+
+    async def add_sku(self, sid, sku):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.manager.add_sku, sid, sku)
+
+    async def totals(self, sid):
+        return await self._call(sid, False, _totals)
+
+    async def close(self, sid):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.manager.close, sid)
+
+    async def evict_idle(self, now=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.manager.evict_idle, now)
+
+    async def sweep(self, interval):
+        # evicts idle carts every interval seconds until cancelled, e.g.
+        # task = asyncio.create_task(mgr.sweep(30))
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    def __contains__(self, sid):
+        return sid in self.manager
+
+    def __len__(self):
+        return len(self.manager)
@@ -0,0 +1,185 @@
+import argparse
+import collections
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+
+from Checkout import Checkout
+from Pricing import BasketThreshold, MultiBuy, PercentOff, PricingRules
+
+
+# Input is a transaction log with one cart line per record, lines of a cart
+# kept together:
+#   CSV:   cart,item,price        (an optional header row is skipped)
+#   JSONL: {"cart": ..., "item": ..., "price": ...}
+
+def _csv_line(line):
+    cart, item, price = line.decode().rstrip('\r\n').rsplit(',', 2)
+    return cart, item, int(price)
+
+
+def _json_line(line):
+    row = json.loads(line)
+    return str(row['cart']), row['item'], row['price']
+
+
+def _parser(path):
+    return _json_line if path.endswith(('.jsonl', '.json')) else _csv_line
+
+
+def _last_cart(mm, end, parse):
+    # cart id of the last non-blank line before end, or None when that is
+    # the header or there is none
+    while end > 0:
+        pos = mm.rfind(b'\n', 0, end - 1) + 1
+        line = mm[pos:end]
+        if line.strip():
+            try:
+                return parse(line)[0]
+            except ValueError:
+                return None
+        end = pos
+    return None
+
+
+def read_lines(path, start=0, end=None):
+    # Yields the (cart, item, price) rows of every cart that starts inside
+    # [start, end). A cart cut by start belongs to the previous range and a
+    # cart cut by end is read to its last line, so ranges can be handed to
+    # separate processes. The file is memory-mapped; only the pages being
+    # parsed are resident.
+    parse = _parser(path)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = size if end is None else min(end, size)
+            skip = None
+            if start > 0:
+                if mm[start - 1:start] != b'\n':
+                    start = mm.find(b'\n', start) + 1 or size
+                skip = _last_cart(mm, start, parse)
+            mm.seek(start)
+            last = None
+            while True:
+                pos = mm.tell()
+                line = mm.readline()
+                if not line:
+                    return
+                if not line.strip():
+                    continue
+                try:
+                    row = parse(line)
+                except ValueError:
+                    if pos != 0 or parse is not _csv_line:
+                        raise
+                    continue
+                if skip is not None:
+                    if row[0] == skip:
+                        continue
+                    skip = None
+                if pos >= end and row[0] != last:
+                    return
+                last = row[0]
+                yield row
+
+
+def read_carts(path, start=0, end=None):
+    rows = read_lines(path, start, end)
+    for cart, lines in itertools.groupby(rows, key=lambda row: row[0]):
+        yield cart, [(item, price) for _, item, price in lines]
+
+
+def split(paths, chunk_bytes):
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, size, chunk_bytes):
+            yield path, start, start + chunk_bytes
+
+
+RULE_TYPES = {rule.__name__: rule for rule in (BasketThreshold, MultiBuy, PercentOff)}
+
+
+def load_rules(path):
+    # a JSON list such as [{"rule": "MultiBuy", "sku": "tea", "buy": 3, "pay": 2}]
+    with open(path) as f:
+        specs = json.load(f)
+    rules = []
+    for spec in specs:
+        spec = dict(spec)
+        name = spec.pop('rule', None)
+        if name not in RULE_TYPES:
+            raise ValueError('Invalid Rule %r' % name)
+        rules.append(RULE_TYPES[name](**spec))
+    return PricingRules(rules)
+
+
+_rules = None
+
+
+def _init_worker(rules):
+    global _rules
+    _rules = rules
+
+
+def total_range(path, start, end):
+    results = []
+    for cart, lines in read_carts(path, start, end):
+        checkout = Checkout(_rules)
+        total, discount = checkout.add_items(lines)
+        results.append((cart, len(lines), total, discount))
+    return results
+
+
+def batch_totals(paths, rules=None, processes=None, chunk_bytes=1 << 22):
+    # Yields (cart, lines, total, discount) in input order. Each worker maps
+    # and parses its own byte range of the input, and at most two ranges per
+    # worker are in flight, so memory does not grow with the input.
+    processes = processes or os.cpu_count() or 1
+    ranges = split(paths, chunk_bytes)
+    if processes == 1:
+        _init_worker(rules)
+        for path, start, end in ranges:
+            yield from total_range(path, start, end)
+        return
+    with multiprocessing.Pool(processes, _init_worker, (rules,)) as pool:
+        pending = collections.deque()
+        for task in ranges:
+            pending.append(pool.apply_async(total_range, task))
+            if len(pending) >= processes * 2:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Total carts from CSV/JSONL transaction logs.')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('-j', '--processes', type=int, default=None)
+    parser.add_argument('--chunk-bytes', type=int, default=1 << 22)
+    parser.add_argument('--rules', metavar='FILE', help='JSON list of pricing rules for the discount column')
+    args = parser.parse_args(argv)
+    rules = load_rules(args.rules) if args.rules else None
+
+    out = sys.stdout
+    carts = lines = 0
+    start = time.perf_counter()
+    out.write('cart,total,discount\n')
+    for cart, count, total, discount in batch_totals(args.paths, rules, args.processes,
+                                                     chunk_bytes=args.chunk_bytes):
+        out.write('%s,%s,%s\n' % (cart, total, discount))
+        carts += 1
+        lines += count
+    elapsed = time.perf_counter() - start
+    rate = elapsed or float('inf')
+    print('%d carts, %d lines in %.2fs (%.0f carts/s, %.0f lines/s)'
+          % (carts, lines, elapsed, carts / rate, lines / rate), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
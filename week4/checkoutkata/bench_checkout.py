@@ -0,0 +1,63 @@
+import sys
+import time
+import tracemalloc
+
+from Checkout import Checkout
+
+
+class ListCheckout:
+    # the original two-list implementation, kept here as the baseline
+    def __init__(self):
+        self.item = []
+        self.price = []
+
+    def add_item(self, item, price):
+        if type(price) != int:
+            raise ValueError('Invalid Price')
+        self.item.append(item)
+        self.price.append(price)
+
+    def cal_total(self):
+        total = 0
+        for i in self.price:
+            total += i
+        return total
+
+    def discount(self):
+        return self.cal_total()
+
+
+def fill(cls, lines):
+    cart = cls()
+    for i in range(lines):
+        cart.add_item('sku%d' % (i % 500), 100000 + i)
+    return cart
+
+
+def measure(cls, lines, calls):
+    tracemalloc.start()
+    start = time.perf_counter()
+    cart = fill(cls, lines)
+    load = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        cart.cal_total()
+        cart.discount()
+    totals = (time.perf_counter() - start) / calls
+    return load, totals, peak
+
+
+def main(argv):
+    lines = int(argv[1]) if len(argv) > 1 else 100000
+    calls = int(argv[2]) if len(argv) > 2 else 100
+    print('%-14s %10s %14s %12s' % ('impl', 'load ms', 'totals us', 'peak KiB'))
+    for cls in (ListCheckout, Checkout):
+        load, totals, peak = measure(cls, lines, calls)
+        print('%-14s %10.2f %14.2f %12d' % (cls.__name__, load * 1e3, totals * 1e6, peak // 1024))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
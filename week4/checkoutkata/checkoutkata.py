@@ -1,4 +1,14 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from batch import batch_totals, main, total_range
+from Catalog import Catalog
 from Checkout import Checkout
+from Pricing import BasketThreshold, MultiBuy, PercentOff
+from Sessions import AsyncSessionManager, SessionManager
 
 
 def test_init_Checkout():
@@ -18,3 +28,260 @@ def test_discount():
     test.add_item('tea', 20)
     assert test.discount()
 
+def test_add_item_invalid_price():
+    test = Checkout()
+    with pytest.raises(ValueError):
+        test.add_item('y', 9.5)
+    assert test.cal_total() == 0
+    assert len(test) == 0
+def test_running_total():
+    test = Checkout()
+    for i in range(1000):
+        test.add_item('sku%d' % (i % 3), i)
+    assert test.cal_total() == sum(range(1000))
+    assert len(test) == 1000
+    assert test.item[:4] == ['sku0', 'sku1', 'sku2', 'sku0']
+    assert test.price[:3] == [0, 1, 2]
+    test.price.append(5)
+    assert len(test.price) == 1000
+def test_add_item_price_out_of_range():
+    test = Checkout()
+    test.add_item('y', 9)
+    with pytest.raises(ValueError, match='Invalid Price'):
+        test.add_item('tea', 2 ** 63)
+    with pytest.raises(ValueError, match='index 1'):
+        test.add_items([('a', 1), ('b', -2 ** 63 - 1)])
+    assert test.cal_total() == 9
+    assert test.item == ['y']
+def test_add_items_pairs():
+    test = Checkout()
+    test.add_item('y', 9)
+    assert test.add_items([('tea', 20), ('y', 9)]) == (38, 38)
+    assert test.item == ['y', 'tea', 'y']
+    assert len(test) == 3
+def test_add_items_columns():
+    test = Checkout()
+    test.add_items(['a', 'b', 'c'], range(3))
+    assert test.cal_total() == 3
+def test_add_items_invalid_price():
+    test = Checkout()
+    test.add_item('y', 9)
+    with pytest.raises(ValueError, match='index 2'):
+        test.add_items([('a', 1), ('b', 2), ('c', '3'), ('d', 4.0)])
+    assert test.cal_total() == 9
+    assert len(test) == 1
+def test_add_items_numpy():
+    np = pytest.importorskip('numpy')
+    test = Checkout()
+    test.add_items(np.array(['a', 'b']), np.array([5, 7]))
+    assert test.cal_total() == 12
+    assert test.item == ['a', 'b']
+    with pytest.raises(ValueError, match='index 0'):
+        test.add_items(np.array(['c']), np.array([1.5]))
+    with pytest.raises(ValueError, match='index 1'):
+        test.add_items(np.array(['c', 'd']), np.array([1, 2 ** 64 - 1], dtype=np.uint64))
+    assert test.add_items(np.array(['c']), np.array([3], dtype=np.uint64)) == (15, 15)
+    assert len(test) == 3
+def test_discount_no_rules():
+    test = Checkout()
+    test.add_item('y', 9)
+    assert test.discount() == 9
+def test_discount_multi_buy():
+    test = Checkout([MultiBuy('tea', 3, 2)])
+    for _ in range(7):
+        test.add_item('tea', 20)
+    test.add_item('y', 9)
+    assert test.cal_total() == 149
+    assert test.discount() == 109
+def test_discount_percent_off():
+    test = Checkout([PercentOff(10, 'tea'), PercentOff(50, 'cake')])
+    test.add_item('tea', 20)
+    test.add_item('cake', 30)
+    test.add_item('y', 9)
+    assert test.discount() == 18 + 15 + 9
+def test_discount_best_rule_wins():
+    test = Checkout([PercentOff(10, 'tea'), MultiBuy('tea', 2, 1)])
+    test.add_item('tea', 20)
+    assert test.discount() == 18
+    test.add_item('tea', 20)
+    assert test.discount() == 20
+def test_discount_basket_threshold():
+    test = Checkout([MultiBuy('tea', 2, 1), BasketThreshold(100, amount=5), PercentOff(10)])
+    test.add_item('tea', 60)
+    test.add_item('tea', 60)
+    assert test.discount() == 60 - 6
+    test.add_item('y', 50)
+    assert test.discount() == 110 - 11
+def test_discount_negative_prices():
+    test = Checkout([PercentOff(10, 'a'), PercentOff(10)])
+    test.add_item('a', -100)
+    assert test.cal_total() == -100
+    assert test.discount() == -100
+    test.add_item('b', 300)
+    assert test.discount() == 180
+def test_invalid_rules():
+    with pytest.raises(ValueError):
+        BasketThreshold(10, percent=-50)
+    with pytest.raises(ValueError):
+        BasketThreshold(10, amount=-5)
+    with pytest.raises(ValueError):
+        BasketThreshold(-1)
+    with pytest.raises(ValueError):
+        PercentOff(110)
+    with pytest.raises(ValueError):
+        MultiBuy('tea', 2, 2)
+    with pytest.raises(ValueError):
+        PercentOff(10.5, 'a')
+    with pytest.raises(ValueError):
+        MultiBuy('tea', 3.0, 2)
+    with pytest.raises(ValueError):
+        BasketThreshold(10, amount=2.5)
+    with pytest.raises(ValueError):
+        BasketThreshold('10')
+def test_discount_add_items():
+    rules = [MultiBuy('tea', 3, 2)]
+    one = Checkout(rules)
+    bulk = Checkout(rules)
+    lines = [('tea', 20), ('y', 9)] * 5
+    for item, price in lines:
+        one.add_item(item, price)
+    assert bulk.add_items(lines) == (one.cal_total(), one.discount())
+def test_batch_totals(tmp_path):
+    csv = tmp_path / 'carts.csv'
+    csv.write_text('cart,item,price\n1,tea,20\n1,y,9\n2,tea,20\n3,y,1\n')
+    jsonl = tmp_path / 'carts.jsonl'
+    jsonl.write_text('{"cart": 4, "item": "tea", "price": 20}\n{"cart": 4, "item": "tea", "price": 20}\n')
+    paths = [str(csv), str(jsonl)]
+    expected = [('1', 2, 29, 29), ('2', 1, 20, 20), ('3', 1, 1, 1), ('4', 2, 40, 20)]
+    rules = [MultiBuy('tea', 2, 1)]
+    assert list(batch_totals(paths, processes=1)) == [row[:3] + (row[2],) for row in expected]
+    assert list(batch_totals(paths, rules, processes=2, chunk_bytes=7)) == expected
+def test_batch_totals_every_split(tmp_path):
+    path = tmp_path / 'carts.csv'
+    path.write_text('cart,item,price\n1,a,1\n\n1,b,2\n2,c,3\n\n\n3,d,4\n3,e,5\n\n4,f,6\n')
+    size = path.stat().st_size
+    expected = list(batch_totals([str(path)], processes=1, chunk_bytes=size))
+    assert [row[:2] for row in expected] == [('1', 2), ('2', 1), ('3', 2), ('4', 1)]
+    for chunk_bytes in range(1, size + 1):
+        assert list(batch_totals([str(path)], processes=1, chunk_bytes=chunk_bytes)) == expected
+    for offset in range(1, size):
+        ranges = [(str(path), 0, offset), (str(path), offset, size)]
+        assert [row for r in ranges for row in total_range(*r)] == expected
+def test_batch_main_rules(tmp_path, capsys):
+    carts = tmp_path / 'carts.csv'
+    carts.write_text('1,tea,20\n1,tea,20\n2,y,9\n')
+    rules = tmp_path / 'rules.json'
+    rules.write_text('[{"rule": "MultiBuy", "sku": "tea", "buy": 2, "pay": 1}]')
+    main([str(carts), '-j', '1', '--rules', str(rules)])
+    assert capsys.readouterr().out == 'cart,total,discount\n1,40,20\n2,9,9\n'
+    rules.write_text('[{"rule": "Nope"}]')
+    with pytest.raises(ValueError):
+        main([str(carts), '-j', '1', '--rules', str(rules)])
+def test_catalog_lookup(tmp_path):
+    path = str(tmp_path / 'catalog.idx')
+    Catalog.build([('tea', 20), ('y', 9), ('cake', 30), ('tea', 25)], path)
+    with Catalog(path, cache_size=2) as catalog:
+        assert len(catalog) == 3
+        assert catalog.price('tea') == 25
+        assert catalog.price('tea') == 25
+        assert (catalog.hits, catalog.misses) == (1, 1)
+        assert 'cake' in catalog
+        assert 'coffee' not in catalog
+        assert 'a much longer sku than any other' not in catalog
+def test_catalog_invalid(tmp_path):
+    path = tmp_path / 'catalog.idx'
+    for data in (b'', b'CKCT', b'nope' * 8, b'CKCT' + b'\xff' * 12):
+        path.write_bytes(data)
+        with pytest.raises(ValueError, match='Invalid Catalog'):
+            Catalog(str(path))
+def test_catalog_build_invalid(tmp_path):
+    path = tmp_path / 'catalog.idx'
+    for price in (2 ** 63, -2 ** 63 - 1, 2.5):
+        with pytest.raises(ValueError, match='Invalid Price'):
+            Catalog.build([('tea', 20), ('y', price)], str(path))
+        assert not path.exists()
+    Catalog.build([('tea', 2 ** 63 - 1), ('y', -2 ** 63)], str(path))
+    with Catalog(str(path)) as catalog:
+        assert catalog.price('tea') == 2 ** 63 - 1
+        assert catalog.price('y') == -2 ** 63
+def test_add_sku(tmp_path):
+    path = str(tmp_path / 'catalog.idx')
+    Catalog.build([('tea', 20), ('y', 9)], path)
+    with Catalog(path) as catalog:
+        test = Checkout([MultiBuy('tea', 2, 1)], catalog=catalog)
+        test.add_sku('tea')
+        test.add_sku('tea')
+        test.add_sku('y')
+        assert test.cal_total() == 49
+        assert test.discount() == 29
+        with pytest.raises(KeyError):
+            test.add_sku('coffee')
+        assert len(test) == 3
+    with pytest.raises(ValueError):
+        Checkout().add_sku('tea')
+def test_sessions():
+    mgr = SessionManager([MultiBuy('tea', 2, 1)], shards=4)
+    mgr.add_item('lane1', 'tea', 20)
+    mgr.add_item('lane2', 'y', 9)
+    mgr.add_item('lane1', 'tea', 20)
+    assert mgr.totals('lane1') == (40, 20)
+    assert len(mgr) == 2
+    assert mgr.close('lane2') == (9, 9)
+    assert 'lane2' not in mgr
+    with pytest.raises(KeyError):
+        mgr.totals('lane2')
+def test_sessions_invalid_shards():
+    for shards in (0, -1, 2.0):
+        with pytest.raises(ValueError):
+            SessionManager(shards=shards)
+def test_sessions_threads():
+    mgr = SessionManager(shards=8)
+    def lane(n):
+        for i in range(200):
+            mgr.add_item('lane%d' % (i % 10), 'tea', n)
+    threads = [threading.Thread(target=lane, args=(n,)) for n in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(mgr.totals('lane%d' % i)[0] for i in range(10)) == 200 * sum(range(1, 9))
+def test_sessions_evict_idle():
+    mgr = SessionManager(idle_timeout=60)
+    mgr.add_item('lane1', 'tea', 20)
+    assert mgr.evict_idle() == 0
+    assert mgr.evict_idle(now=time.monotonic() + 61) == 1
+    assert len(mgr) == 0
+def test_sessions_async():
+    mgr = AsyncSessionManager(shards=4, idle_timeout=60)
+    async def run():
+        await asyncio.gather(*(mgr.add_item('lane%d' % (i % 3), 'tea', 1) for i in range(30)))
+        totals = [await mgr.totals('lane%d' % i) for i in range(3)]
+        closed = await mgr.close('lane0')
+        evicted = await mgr.evict_idle(time.monotonic() + 61)
+        return totals, closed, evicted
+    assert asyncio.run(run()) == ([(10, 10)] * 3, (10, 10), 2)
+def test_sessions_async_add_sku():
+    class Catalog:
+        threads = []
+        def price(self, sku):
+            self.threads.append(threading.get_ident())
+            return 20
+    mgr = AsyncSessionManager(catalog=Catalog(), shards=4)
+    async def run():
+        await asyncio.gather(*(mgr.add_sku('lane1', 'tea') for _ in range(3)))
+        return await mgr.totals('lane1')
+    assert asyncio.run(run()) == (60, 60)
+    # the catalog lookup may block, so it never runs on the event loop
+    assert threading.get_ident() not in Catalog.threads
+def test_sessions_sweep():
+    mgr = AsyncSessionManager(idle_timeout=0)
+    async def run():
+        await mgr.add_item('lane1', 'tea', 1)
+        task = asyncio.ensure_future(mgr.sweep(0.01))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if 'lane1' not in mgr:
+                break
+        task.cancel()
+        return len(mgr)
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import threading
+import time
+
+from Sessions import AsyncSessionManager, SessionManager
+
+# Each lane scans into its own session with add_sku. --hold is the latency of
+# the price lookup, which add_sku makes while its cart is locked; with a
+# single lock that time serialises every lane, with sharded locks only lanes
+# on the same shard wait for each other. asyncio lanes use add_item and await
+# the hold between scans instead, as a web session would await its client.
+
+
+class SlowCatalog:
+    # stands in for a price service that takes `hold` seconds to answer
+    def __init__(self, hold):
+        self.hold = hold
+
+    def price(self, sku):
+        if self.hold:
+            time.sleep(self.hold)
+        return 100
+
+
+def run_threads(shards, lanes, scans, hold):
+    mgr = SessionManager(catalog=SlowCatalog(hold), shards=shards)
+
+    def lane(sid):
+        for i in range(scans):
+            mgr.add_sku(sid, 'sku%d' % (i % 50))
+        mgr.close(sid)
+
+    threads = [threading.Thread(target=lane, args=('lane%d' % n,)) for n in range(lanes)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return lanes * scans / (time.perf_counter() - start)
+
+
+def run_tasks(shards, lanes, scans, hold):
+    mgr = AsyncSessionManager(shards=shards)
+
+    async def lane(sid):
+        for i in range(scans):
+            await mgr.add_item(sid, 'sku%d' % (i % 50), 100)
+            if hold:
+                await asyncio.sleep(hold)
+        await mgr.close(sid)
+
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(*(lane('lane%d' % n) for n in range(lanes)))
+        return lanes * scans / (time.perf_counter() - start)
+
+    return asyncio.run(main())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Session manager load test.')
+    parser.add_argument('--lanes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--scans', type=int, default=200)
+    parser.add_argument('--hold', type=float, default=0.0005)
+    args = parser.parse_args(argv)
+
+    print('%-8s %6s %16s %16s %16s' % ('mode', 'lanes', '1 lock ops/s', '64 shards ops/s', 'speedup'))
+    for lanes in args.lanes:
+        single = run_threads(1, lanes, args.scans, args.hold)
+        sharded = run_threads(64, lanes, args.scans, args.hold)
+        print('%-8s %6d %16.0f %16.0f %15.1fx' % ('threads', lanes, single, sharded, sharded / single))
+    for lanes in args.lanes:
+        ops = run_tasks(64, lanes, args.scans, args.hold)
+        print('%-8s %6d %16s %16.0f' % ('asyncio', lanes, '-', ops))
+
+
+if __name__ == '__main__':
+    main()